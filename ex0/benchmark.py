@@ -0,0 +1,246 @@
+"""
+Benchmarks every Maze.solve strategy on reproducible generated mazes.
+
+Usage: python benchmark.py [--sizes N ...] [--styles STYLE ...]
+                           [--strategies STRATEGY ...] [--seed SEED]
+                           [--no-memory] [--replan N]
+                           [--iterative-cells N] [--output FILE]
+
+Generates square mazes of about N cells (default 10^2 through 10^7) in each
+style, "backtracker" (recursive backtracker corridors) and "open" (randomly
+placed walls), plus maze1-3. Solves each with every strategy and writes one
+JSON record per run: states explored and queued, duplicate states turned
+away, peak frontier size, states per second, peak memory allocated while
+solving and wall time.
+
+The iterative deepening strategies keep only the current path, trading
+memory for time that grows exponentially with the number of paths, so
+they run only on mazes of at most --iterative-cells cells (default 100),
+and only when the maze has a solution, since otherwise they try every
+path from the start before giving up.
+
+With --replan N, also toggles N random cells of each maze one at a time,
+recording how many states IncrementalPlanner expands to repair the path
+against how many a fresh A* search explores.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from maze import STRATEGIES, CompactMaze, IncrementalPlanner
+
+STYLES = ["backtracker", "open"]
+ITERATIVE = ["iddfs", "idastar"]
+SIZES = [10 ** exponent for exponent in range(2, 8)]
+
+
+def backtracker(size, rng):
+    """Returns the rows of a maze of corridors carved by a recursive backtracker."""
+
+    # Carve passages between cells at odd coordinates
+    side = max(5, int(math.sqrt(size)) | 1)
+    rows = [bytearray(b"#" * side) for _ in range(side)]
+    rows[1][1] = ord(" ")
+    stack = [(1, 1)]
+    while stack:
+        row, col = stack[-1]
+        options = [
+            (row + dr, col + dc)
+            for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 0 < row + dr < side - 1 and 0 < col + dc < side - 1
+            and rows[row + dr][col + dc] == ord("#")
+        ]
+        if not options:
+            stack.pop()
+            continue
+        r, c = rng.choice(options)
+        rows[(row + r) // 2][(col + c) // 2] = ord(" ")
+        rows[r][c] = ord(" ")
+        stack.append((r, c))
+
+    rows[1][1] = ord("A")
+    rows[side - 2][side - 2] = ord("B")
+    return rows
+
+
+def open_field(size, rng, density=0.25):
+    """Returns the rows of a maze of randomly placed walls, corner to corner."""
+    side = max(2, int(math.sqrt(size)))
+    rows = [
+        bytearray(ord("#") if rng.random() < density else ord(" ")
+                  for _ in range(side))
+        for _ in range(side)
+    ]
+    rows[0][0] = ord("A")
+    rows[-1][-1] = ord("B")
+    return rows
+
+
+GENERATORS = {"backtracker": backtracker, "open": open_field}
+
+
+def generate(filename, style, size, seed):
+    """Writes a generated maze to a file."""
+    rows = GENERATORS[style](size, random.Random(seed))
+    with open(filename, "wb") as f:
+        f.write(b"\n".join(rows))
+
+
+def run(maze, strategy, memory=True):
+    """Solves a maze with a strategy, returning its measurements."""
+    record = {"strategy": strategy}
+    try:
+        maze.solve(strategy)
+        record["solved"] = True
+    except Exception:
+        record["solved"] = False
+
+    stats = maze.stats
+    record["explored"] = stats.expanded
+    record["path_length"] = len(maze.solution[0]) if record["solved"] else None
+    record["enqueued"] = stats.enqueued
+    record["duplicates"] = stats.duplicates
+    record["peak_frontier"] = stats.peak_frontier
+    record["states_per_second"] = stats.expansions_per_second()
+    record["seconds"] = stats.seconds
+
+    # Measure memory in a second run, since tracing slows the search down
+    if memory:
+        tracemalloc.start()
+        try:
+            maze.solve(strategy)
+        except Exception:
+            pass
+        record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    maze.solution = None
+    maze.explored = None
+    return record
+
+
+def solvable(maze):
+    """Returns whether maze has a solution, using breadth-first search."""
+    try:
+        maze.solve("bfs")
+        return True
+    except Exception:
+        return False
+    finally:
+        maze.solution = None
+        maze.explored = None
+
+
+def replan(maze, toggles, seed):
+    """Toggles random cells, returning a record per incremental plan.
+
+    The first record is the initial plan, which searches from scratch.
+    """
+    rng = random.Random(seed)
+    planner = IncrementalPlanner(maze)
+    records = []
+    for i in range(toggles + 1):
+        cell = None
+        if i:
+            cell = (rng.randrange(maze.height), rng.randrange(maze.width))
+            if cell in (maze.start, maze.goal):
+                continue
+            planner.toggle(cell)
+
+        record = {"toggle": cell and list(cell)}
+        start = time.perf_counter()
+        try:
+            planner.plan()
+            record["solved"] = True
+        except Exception:
+            record["solved"] = False
+        record["seconds"] = time.perf_counter() - start
+        record["reexpanded"] = planner.num_expanded
+
+        # Compare with searching the changed maze from scratch
+        start = time.perf_counter()
+        try:
+            maze.solve("astar")
+        except Exception:
+            pass
+        record["full_search_explored"] = maze.num_explored
+        record["full_search_seconds"] = time.perf_counter() - start
+        records.append(record)
+
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark maze solving strategies.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--styles", nargs="+", choices=STYLES, default=STYLES)
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES,
+                        default=list(STRATEGIES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip the traced run that measures peak memory")
+    parser.add_argument("--iterative-cells", type=int, default=100, metavar="N",
+                        help="largest maze to run iterative deepening on")
+    parser.add_argument("--replan", type=int, default=0, metavar="N",
+                        help="also replan after N random wall toggles per maze")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    records = []
+    with tempfile.TemporaryDirectory() as directory:
+
+        # Mazes to run, as (style, filename)
+        mazes = [("file", os.path.join(here, f"maze{i}.txt")) for i in range(1, 4)]
+        for style in args.styles:
+            for size in args.sizes:
+                filename = os.path.join(directory, f"{style}{size}.txt")
+                generate(filename, style, size, args.seed)
+                mazes.append((style, filename))
+
+        for style, filename in mazes:
+            maze = CompactMaze(filename)
+            cells = maze.height * maze.width
+            iterative = (cells <= args.iterative_cells
+                         and any(strategy in ITERATIVE for strategy in args.strategies)
+                         and solvable(maze))
+            for strategy in args.strategies:
+                if strategy in ITERATIVE and not iterative:
+                    continue
+                record = {
+                    "maze": os.path.basename(filename) if style == "file" else style,
+                    "seed": None if style == "file" else args.seed,
+                    "cells": cells
+                }
+                record.update(run(maze, strategy, args.memory))
+                records.append(record)
+                print(f"{record['maze']:<12}{record['cells']:>10}"
+                      f"{strategy:>15}{record['explored']:>10}"
+                      f"{record['seconds']:>10.3f}s", file=sys.stderr)
+
+            if args.replan:
+                for record in replan(maze, args.replan, args.seed):
+                    record.update({
+                        "maze": os.path.basename(filename) if style == "file" else style,
+                        "cells": maze.height * maze.width,
+                        "strategy": "incremental"
+                    })
+                    records.append(record)
+
+    report = json.dumps(records, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
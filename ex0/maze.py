@@ -1,43 +1,213 @@
+import argparse
+import glob
+import heapq
+import json
+import multiprocessing
+import os
 import sys
+import time
+from array import array
+from collections import deque
+
+STRATEGIES = ("dfs", "bfs", "ucs", "greedy", "astar", "bidirectional", "jps",
+              "iddfs", "idastar")
+
+INFINITY = float("inf")
+
+# Rows parsed at a time, and bytes scanned for line breaks at a time,
+# when loading a CompactMaze
+CHUNK_ROWS = 1024
+CHUNK_BYTES = 1 << 24
+
+# Cell codes of the binary maze format
+OPEN, WALL, START, GOAL = 0, 1, 2, 3
+
+# Action that undoes each move, for paths found by searching from the goal
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+# Moves by action, and the codes used for actions in DistanceField
+MOVES = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+ACTIONS = list(MOVES)
+CODES = {action: code for code, action in enumerate(ACTIONS)}
+DIRECTIONS = {move: action for action, move in MOVES.items()}
+NO_ACTION = 255
+
+
+def manhattan(state, goal):
+    """Returns the Manhattan distance between two cells."""
+    return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+
 
 class Node():
-    def __init__(self, state, parent, action):
+    __slots__ = ("state", "parent", "action", "cost")
+
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
+
+
+class SearchStats():
+    """Counters and timings of the last search run by Maze.solve.
+
+    `duplicates` counts neighbors turned away because they were already
+    explored or queued. `neighbor_seconds` is only measured when solve is
+    called with profile=True, and `frontier_seconds` is then the rest of
+    the search time, most of which is spent on the frontier. Without
+    profiling both are None.
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.enqueued = 0
+        self.duplicates = 0
+        self.peak_frontier = 0
+        self.seconds = 0.0
+        self.neighbor_seconds = None
+        self.frontier_seconds = None
+
+    def expansions_per_second(self):
+        return self.expanded / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        stats = dict(vars(self))
+        stats["expansions_per_second"] = self.expansions_per_second()
+        return stats
+
+
+class NodeStore():
+    """Explored states and how each was reached, in flat per-cell arrays.
+
+    Works as the set of states added, storing for each the integer index
+    of its parent cell and the code of the action from it, so explored
+    states need no Node objects. The root stores itself as its parent.
+    """
+
+    def __init__(self, height, width):
+        self.width = width
+        self.parents = array("i", [-1]) * (height * width)
+        self.actions = bytearray(height * width)
+        self.size = 0
+
+    def add(self, state, parent=None, action=None):
+        index = state[0] * self.width + state[1]
+        if self.parents[index] < 0:
+            self.size += 1
+        if parent is None:
+            self.parents[index] = index
+        else:
+            self.parents[index] = parent[0] * self.width + parent[1]
+            self.actions[index] = CODES[action]
+
+    def __contains__(self, state):
+        return self.parents[state[0] * self.width + state[1]] >= 0
+
+    def __iter__(self):
+        for index, parent in enumerate(self.parents):
+            if parent >= 0:
+                yield divmod(index, self.width)
+
+    def __len__(self):
+        return self.size
+
+    def path(self, state):
+        """Returns the (actions, cells) path from the root to a stored state."""
+        actions = []
+        cells = []
+        index = state[0] * self.width + state[1]
+        while self.parents[index] != index:
+            actions.append(ACTIONS[self.actions[index]])
+            cells.append(divmod(index, self.width))
+            index = self.parents[index]
+        actions.reverse()
+        cells.reverse()
+        return (actions, cells)
 
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Index of states currently in the frontier, for constant time lookup
+        self.states = dict()
+
+        # Largest number of nodes held at once
+        self.peak = 0
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+        if len(self.frontier) > self.peak:
+            self.peak = len(self.frontier)
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def pop(self):
+        return self.frontier.pop()
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.pop()
+            count = self.states[node.state] - 1
+            if count:
+                self.states[node.state] = count
+            else:
+                del self.states[node.state]
             return node
 
 
 class QueueFrontier(StackFrontier):
 
+    def pop(self):
+        return self.frontier.popleft()
+
+
+class PriorityFrontier():
+    def __init__(self):
+        self.frontier = []
+
+        # Cheapest node queued so far for each state in the frontier
+        self.states = dict()
+
+        # Insertion counter, so that equal priorities are removed in FIFO order
+        self.count = 0
+
+        # Largest number of states held at once
+        self.peak = 0
+
+    def add(self, node, priority):
+        heapq.heappush(self.frontier, (priority, self.count, node))
+        self.count += 1
+        self.states[node.state] = node
+        if len(self.states) > self.peak:
+            self.peak = len(self.states)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def get(self, state):
+        return self.states.get(state)
+
+    def empty(self):
+        return len(self.states) == 0
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
-        else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+        while True:
+            _, _, node = heapq.heappop(self.frontier)
+
+            # Skip entries replaced by a cheaper path to the same state
+            if self.states.get(node.state) is node:
+                del self.states[node.state]
+                return node
 
 class Maze():
 
@@ -100,6 +270,19 @@ class Maze():
         print()
 
 
+    def open_cell(self, row, col):
+        """Returns True if a cell is inside the maze and not a wall."""
+        return (0 <= row < self.height and 0 <= col < self.width
+                and not self.walls[row][col])
+
+
+    def memory_per_cell(self):
+        """Returns the number of bytes used to store the walls, per cell."""
+        size = sys.getsizeof(self.walls)
+        size += sum(sys.getsizeof(row) for row in self.walls)
+        return size / (self.height * self.width)
+
+
     def neighbors(self, state):
         row, col = state
         candidates = [
@@ -116,114 +299,926 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def solve(self, strategy="dfs", heuristic=None, on_expand=None,
+              on_enqueue=None, on_goal=None, profile=False, limit=None):
+        """Finds a solution to maze, if one exists.
+
+        `strategy` is one of "dfs", "bfs", "ucs" (uniform-cost), "greedy"
+        (greedy best-first), "astar", "bidirectional" (breadth-first from
+        both ends), "jps" (jump point search), "iddfs" (iterative deepening)
+        or "idastar" (iterative deepening A*). The informed strategies
+        estimate the distance left with `heuristic(state, goal)`, which
+        defaults to the Manhattan distance.
+
+        `on_expand(state)` and `on_enqueue(state)` are called as states are
+        expanded and queued, and `on_goal(solution)` once a solution is
+        found. Counters are kept in `self.stats`, a SearchStats; `profile`
+        also times neighbor generation.
+
+        The iterative strategies keep no explored set, so on a maze with no
+        solution they try every path from start before raising, which takes
+        exponential time on all but small or corridor-like mazes. With
+        `limit`, they raise once they have expanded more than limit states.
+        """
+        if strategy not in STRATEGIES:
+            raise Exception(f"unknown strategy {strategy}")
+        if heuristic is None:
+            heuristic = manhattan
+
+        # Reset the counters, so a search that raises reports only itself
+        self.stats = SearchStats()
+        self.num_explored = 0
+        self.max_frontier = 0
+
+        hooks = (on_expand, on_enqueue, profile)
+        start = time.perf_counter()
+        try:
+            if strategy == "bidirectional":
+                self.solve_bidirectional(*hooks)
+            elif strategy == "jps":
+                self.solve_jps(heuristic, *hooks)
+            elif strategy == "iddfs":
+                self.solve_iterative(lambda state, goal: 0, *hooks, limit)
+            elif strategy == "idastar":
+                self.solve_iterative(heuristic, *hooks, limit)
+            else:
+                self.solve_frontier(strategy, heuristic, *hooks)
+        finally:
+            stats = self.stats
+            stats.seconds = time.perf_counter() - start
+            if profile:
+                stats.frontier_seconds = stats.seconds - stats.neighbor_seconds
+            stats.expanded = self.num_explored
+            stats.peak_frontier = self.max_frontier
+        if on_goal is not None:
+            on_goal(self.solution)
+
+
+    def timed(self, function):
+        """Wraps a neighbor generating function to time it in self.stats."""
+        stats = self.stats
+        stats.neighbor_seconds = 0.0
+
+        def wrapper(*args):
+            generating = time.perf_counter()
+            result = function(*args)
+            stats.neighbor_seconds += time.perf_counter() - generating
+            return result
+        return wrapper
+
+
+    def solve_frontier(self, strategy, heuristic=manhattan, on_expand=None,
+                       on_enqueue=None, profile=False):
+        """Finds a solution by expanding nodes from a frontier, for solve."""
+
+        def priority(node):
+            """Returns the order in which a node leaves the priority frontier."""
+            if strategy == "ucs":
+                return node.cost
+            h = heuristic(node.state, self.goal)
+            if strategy == "greedy":
+                return h
+
+            # Break ties between equal estimates in favour of nodes nearer the goal
+            return (node.cost + h, h)
 
         # Keep track of number of states explored
         self.num_explored = 0
+        stats = self.stats = SearchStats()
+        neighbors = self.timed(self.neighbors) if profile else self.neighbors
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
-        frontier.add(start)
+        informed = strategy not in ("dfs", "bfs")
+        if strategy == "dfs":
+            frontier = StackFrontier()
+        elif strategy == "bfs":
+            frontier = QueueFrontier()
+        else:
+            frontier = PriorityFrontier()
+        if informed:
+            frontier.add(start, priority(start))
+        else:
+            frontier.add(start)
+        stats.enqueued += 1
+        if on_enqueue is not None:
+            on_enqueue(start.state)
 
-        # Initialize an empty explored set
+        # Initialize an empty explored set. Nodes in the frontier refer to
+        # their parent by state, and the explored set keeps the parent links.
+        self.explored = NodeStore(self.height, self.width)
+
+        # Keep looping until solution found, recording the largest frontier
+        # however the search ends
+        try:
+            while True:
+
+                # If nothing left in frontier, then no path
+                if frontier.empty():
+                    raise Exception("no solution")
+
+                # Choose a node from the frontier
+                node = frontier.remove()
+                self.num_explored += 1
+                if on_expand is not None:
+                    on_expand(node.state)
+
+                # If node is the goal, then we have a solution
+                if node.state == self.goal:
+                    actions, cells = self.explored.path(node.parent)
+                    actions.append(node.action)
+                    cells.append(node.state)
+                    self.solution = (actions, cells)
+                    return
+
+                # Mark node as explored
+                self.explored.add(node.state, node.parent, node.action)
+
+                # Add neighbors to frontier
+                for action, state in neighbors(node.state):
+                    if state in self.explored:
+                        stats.duplicates += 1
+                        continue
+                    if informed:
+
+                        # Queue the neighbor again only if this path to it is cheaper
+                        queued = frontier.get(state)
+                        if queued is not None and node.cost + 1 >= queued.cost:
+                            stats.duplicates += 1
+                            continue
+                        child = Node(state=state, parent=node.state,
+                                     action=action, cost=node.cost + 1)
+                        frontier.add(child, priority(child))
+                    elif not frontier.contains_state(state):
+                        child = Node(state=state, parent=node.state, action=action,
+                                     cost=node.cost + 1)
+                        frontier.add(child)
+                    else:
+                        stats.duplicates += 1
+                        continue
+                    stats.enqueued += 1
+                    if on_enqueue is not None:
+                        on_enqueue(state)
+        finally:
+            self.max_frontier = frontier.peak
+
+
+    def solve_bidirectional(self, on_expand=None, on_enqueue=None,
+                            profile=False):
+        """Finds a shortest solution by searching from start and goal at once."""
+
+        # Keep track of number of states explored, and of the largest
+        # number of states waiting to be expanded at once
+        self.num_explored = 0
+        self.max_frontier = 0
         self.explored = set()
+        stats = self.stats = SearchStats()
+        neighbors = self.timed(self.neighbors) if profile else self.neighbors
 
-        # Keep looping until solution found
-        while True:
+        # Nodes reached from each end, keyed by state. Nodes reached from the
+        # goal store the action leading from their state back to their parent.
+        forward = {self.start: Node(state=self.start, parent=None, action=None)}
+        backward = {self.goal: Node(state=self.goal, parent=None, action=None)}
+        forward_layer = list(forward.values())
+        backward_layer = list(backward.values())
+        for state in (self.start, self.goal):
+            stats.enqueued += 1
+            if on_enqueue is not None:
+                on_enqueue(state)
 
-            # If nothing left in frontier, then no path
-            if frontier.empty():
-                raise Exception("no solution")
+        while forward_layer and backward_layer:
+            self.max_frontier = max(
+                self.max_frontier, len(forward_layer) + len(backward_layer)
+            )
 
-            # Choose a node from the frontier
-            node = frontier.remove()
-            self.num_explored += 1
+            # Grow the smaller side by one whole layer
+            is_forward = len(forward_layer) <= len(backward_layer)
+            if is_forward:
+                layer, reached, other = forward_layer, forward, backward
+            else:
+                layer, reached, other = backward_layer, backward, forward
+
+            meet = None
+            next_layer = []
+            for node in layer:
+                self.num_explored += 1
+                self.explored.add(node.state)
+                if on_expand is not None:
+                    on_expand(node.state)
+                for action, state in neighbors(node.state):
+                    if state in reached:
+                        stats.duplicates += 1
+                        continue
+                    if not is_forward:
+                        action = OPPOSITE[action]
+                    child = Node(state=state, parent=node, action=action,
+                                 cost=node.cost + 1)
+                    reached[state] = child
+                    next_layer.append(child)
+                    stats.enqueued += 1
+                    if on_enqueue is not None:
+                        on_enqueue(state)
 
-            # If node is the goal, then we have a solution
-            if node.state == self.goal:
+                    # Keep the shortest of the paths meeting in this layer
+                    if state in other:
+                        length = child.cost + other[state].cost
+                        if meet is None or length < meet[0]:
+                            meet = (length, state)
+
+            if meet is not None:
+                _, state = meet
+
+                # Walk back from the meeting cell to the start
                 actions = []
                 cells = []
+                node = forward[state]
                 while node.parent is not None:
                     actions.append(node.action)
                     cells.append(node.state)
                     node = node.parent
                 actions.reverse()
                 cells.reverse()
+
+                # Then walk on from the meeting cell to the goal
+                node = backward[state]
+                while node.parent is not None:
+                    actions.append(node.action)
+                    cells.append(node.parent.state)
+                    node = node.parent
                 self.solution = (actions, cells)
                 return
 
-            # Mark node as explored
-            self.explored.add(node.state)
+            if is_forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+
+        raise Exception("no solution")
+
+
+    def solve_jps(self, heuristic=manhattan, on_expand=None, on_enqueue=None,
+                  profile=False):
+        """Finds a shortest solution with jump point search.
+
+        A* search over jump points only: cells where a shortest path may
+        have to turn. Paths are kept canonical by moving horizontally first,
+        so a vertical move turns only where a wall behind it forces it to.
+        """
+
+        def jump(state, direction):
+            """Returns the next jump point from state in direction, if any."""
+            row, col = state
+            dr, dc = direction
+            while True:
+                row, col = row + dr, col + dc
+                if not self.open_cell(row, col):
+                    return None
+                if (row, col) == self.goal:
+                    return (row, col)
+
+                # Moving horizontally, stop where a vertical move leads somewhere
+                if dr == 0:
+                    if (jump((row, col), (-1, 0)) is not None
+                            or jump((row, col), (1, 0)) is not None):
+                        return (row, col)
+
+                # Moving vertically, stop where a side opens up past a wall
+                else:
+                    for side in (-1, 1):
+                        if (self.open_cell(row, col + side)
+                                and not self.open_cell(row - dr, col + side)):
+                            return (row, col)
+
+        def directions(node):
+            """Returns the directions worth jumping in from a node."""
+            if node.action is None:
+                return list(DIRECTIONS)
+            dr, dc = node.action
+            if dr == 0:
+                return [(0, dc), (-1, 0), (1, 0)]
+            row, col = node.state
+            result = [(dr, 0)]
+            for side in (-1, 1):
+                if (self.open_cell(row, col + side)
+                        and not self.open_cell(row - dr, col + side)):
+                    result.append((0, side))
+            return result
+
+        # Keep track of number of states explored
+        self.num_explored = 0
+        stats = self.stats = SearchStats()
+        next_jump = self.timed(jump) if profile else jump
+
+        # Initialize frontier to just the starting position. Nodes store the
+        # direction they were reached in as their action.
+        start = Node(state=self.start, parent=None, action=None)
+        frontier = PriorityFrontier()
+        frontier.add(start, 0)
+        stats.enqueued += 1
+        if on_enqueue is not None:
+            on_enqueue(start.state)
+
+        # Initialize an empty explored set
+        self.explored = set()
 
-            # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
+        # Keep looping until solution found, recording the largest frontier
+        # however the search ends
+        try:
+            while True:
 
+                # If nothing left in frontier, then no path
+                if frontier.empty():
+                    raise Exception("no solution")
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
+                # Choose a node from the frontier
+                node = frontier.remove()
+                self.num_explored += 1
+                if on_expand is not None:
+                    on_expand(node.state)
+
+                # If node is the goal, fill in the cells between jump points
+                if node.state == self.goal:
+                    actions = []
+                    cells = []
+                    while node.parent is not None:
+                        action = DIRECTIONS[node.action]
+                        dr, dc = node.action
+                        row, col = node.state
+                        while (row, col) != node.parent.state:
+                            actions.append(action)
+                            cells.append((row, col))
+                            row, col = row - dr, col - dc
+                        node = node.parent
+                    actions.reverse()
+                    cells.reverse()
+                    self.solution = (actions, cells)
+                    return
+
+                # Mark node as explored
+                self.explored.add(node.state)
+
+                # Add jump points to frontier
+                for direction in directions(node):
+                    state = next_jump(node.state, direction)
+                    if state is None:
+                        continue
+                    cost = node.cost + manhattan(node.state, state)
+                    queued = frontier.get(state)
+                    if (state in self.explored
+                            or queued is not None and cost >= queued.cost):
+                        stats.duplicates += 1
+                        continue
+                    child = Node(state=state, parent=node, action=direction,
+                                 cost=cost)
+                    h = heuristic(state, self.goal)
+                    frontier.add(child, (cost + h, h))
+                    stats.enqueued += 1
+                    if on_enqueue is not None:
+                        on_enqueue(state)
+        finally:
+            self.max_frontier = frontier.peak
+
+
+    def solve_iterative(self, heuristic=manhattan, on_expand=None,
+                        on_enqueue=None, profile=False, limit=None):
+        """Finds a shortest solution with iterative deepening A* (IDA*).
+
+        Repeats a depth-first search that prunes states whose cost plus
+        heuristic exceeds a bound, raising the bound to the smallest pruned
+        value each time. Only the current path is kept, so memory grows
+        with its depth, but states are explored again on every iteration and
+        along every path that reaches them. With a zero heuristic this is
+        iterative deepening depth-first search. `explored` is left empty.
+        Raises once more than `limit` states are expanded, if given.
+        """
+
+        # Keep track of number of states explored, and of the deepest path
+        self.num_explored = 0
+        self.max_frontier = 0
+        self.explored = set()
+        stats = self.stats = SearchStats()
+        neighbors = self.timed(self.neighbors) if profile else self.neighbors
+
+        bound = heuristic(self.start, self.goal)
+        while True:
+
+            # Depth-first search along the path from start, one iterator of
+            # neighbors per state on it
+            path = [self.start]
+            actions = []
+            on_path = {self.start}
+            stack = [iter(neighbors(self.start))]
+            self.num_explored += 1
+            stats.enqueued += 1
+            if on_enqueue is not None:
+                on_enqueue(self.start)
+            if on_expand is not None:
+                on_expand(self.start)
+            smallest = INFINITY
+            while stack:
+                self.max_frontier = max(self.max_frontier, len(stack))
+                for action, state in stack[-1]:
+                    if state in on_path:
+                        stats.duplicates += 1
+                        continue
+
+                    # Prune states past the bound, remembering the next bound
+                    estimate = len(path) + heuristic(state, self.goal)
+                    if estimate > bound:
+                        smallest = min(smallest, estimate)
+                        continue
+
+                    path.append(state)
+                    actions.append(action)
+                    on_path.add(state)
+                    stats.enqueued += 1
+                    if on_enqueue is not None:
+                        on_enqueue(state)
+                    if state == self.goal:
+                        self.solution = (actions, path[1:])
+                        return
+                    self.num_explored += 1
+                    if limit is not None and self.num_explored > limit:
+                        raise Exception("expansion limit reached")
+                    if on_expand is not None:
+                        on_expand(state)
+                    stack.append(iter(neighbors(state)))
+                    break
+
+                # Backtrack once all neighbors of a state are done
+                else:
+                    stack.pop()
+                    on_path.discard(path.pop())
+                    if actions:
+                        actions.pop()
+
+            # If nothing was pruned, then no path
+            if smallest == INFINITY:
+                raise Exception("no solution")
+            bound = smallest
+
+
+    def distance_field(self):
+        """Returns the DistanceField of every cell to the goal."""
+        import numpy as np
+
+        # Flat arrays indexed by row * width + column
+        distance = array("i", [-1]) * (self.height * self.width)
+        next_hop = bytearray([NO_ACTION]) * (self.height * self.width)
+        codes = {action: ACTIONS.index(OPPOSITE[action]) for action in ACTIONS}
+
+        # Breadth-first search outwards from the goal
+        row, col = self.goal
+        distance[row * self.width + col] = 0
+        queue = deque([self.goal])
+        while queue:
+            state = queue.popleft()
+            steps = distance[state[0] * self.width + state[1]] + 1
+            for action, (row, col) in self.neighbors(state):
+                index = row * self.width + col
+                if distance[index] < 0:
+                    distance[index] = steps
+                    next_hop[index] = codes[action]
+                    queue.append((row, col))
+
+        shape = (self.height, self.width)
+        return DistanceField(
+            np.frombuffer(distance, dtype=np.int32).reshape(shape),
+            np.frombuffer(next_hop, dtype=np.uint8).reshape(shape),
+            self.goal
+        )
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50):
+        import numpy as np
+        from PIL import Image
         cell_border = 2
 
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
+        # Color each cell, from lowest to highest precedence
+        colors = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        # Empty cell
+        colors[:] = (237, 240, 252)
+
+        if self.solution is not None:
+
+            # Explored
+            if show_explored and self.explored:
+                rows, cols = zip(*self.explored)
+                colors[list(rows), list(cols)] = (212, 97, 85)
+
+            # Solution
+            if show_solution and self.solution[1]:
+                rows, cols = zip(*self.solution[1])
+                colors[list(rows), list(cols)] = (220, 235, 113)
+
+        # Goal and start
+        colors[self.goal] = (0, 171, 28)
+        colors[self.start] = (255, 0, 0)
+
+        # Walls
+        colors[np.asarray(self.walls, dtype=bool)] = (40, 40, 40)
+
+        # Scale each cell up to a block of pixels, with a black border
+        pixels = np.zeros(
+            (self.height, cell_size, self.width, cell_size, 4), dtype=np.uint8
         )
-        draw = ImageDraw.Draw(img)
+        pixels[..., 3] = 255
+        inside = slice(cell_border, cell_size - cell_border + 1)
+        pixels[:, inside, :, inside, :3] = colors[:, None, :, None, :]
+        pixels = pixels.reshape(self.height * cell_size, self.width * cell_size, 4)
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+        Image.fromarray(pixels, "RGBA").save(filename)
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+class DistanceField():
+    """Shortest distances from every cell of a maze to its goal.
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+    `distance` holds the number of moves to the goal, or -1 where the goal
+    cannot be reached. `next_hop` holds the first move of a shortest path,
+    as an index into ACTIONS, or NO_ACTION.
+    """
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+    def __init__(self, distance, next_hop, goal):
+        self.distance = distance
+        self.next_hop = next_hop
+        self.goal = goal
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+    @classmethod
+    def load(cls, filename):
+        """Loads a distance field saved with `save`."""
+        import numpy as np
+        with np.load(filename) as data:
+            goal = tuple(int(x) for x in data["goal"])
+            return cls(data["distance"], data["next_hop"], goal)
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
+    def save(self, filename):
+        """Saves the distance field to a .npz file."""
+        import numpy as np
+        np.savez(filename, distance=self.distance, next_hop=self.next_hop,
+                 goal=self.goal)
+
+    def path(self, start):
+        """Returns the (actions, cells) solution from `start` to the goal."""
+        if self.distance[start] < 0:
+            raise Exception("no solution")
+        actions = []
+        cells = []
+        state = start
+        while state != self.goal:
+            action = ACTIONS[self.next_hop[state]]
+            dr, dc = MOVES[action]
+            state = (state[0] + dr, state[1] + dc)
+            actions.append(action)
+            cells.append(state)
+        return (actions, cells)
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
+
+class IncrementalPlanner():
+    """Lifelong Planning A* (LPA*) over a maze whose walls change.
+
+    Keeps each state's distance from the start (g) and its one-step
+    lookahead (rhs) between plans. After walls are toggled, `plan` expands
+    only the states whose distance changed. `num_expanded` counts the
+    expansions of the last plan.
+    """
+
+    def __init__(self, maze, heuristic=manhattan):
+        self.maze = maze
+        self.heuristic = heuristic
+        self.g = dict()
+        self.rhs = {maze.start: 0}
+
+        # Priority queue of inconsistent states, with the current key of each
+        self.queue = []
+        self.keys = dict()
+        self.push(maze.start)
+
+        self.num_expanded = 0
+
+    def key(self, state):
+        value = min(self.g.get(state, INFINITY), self.rhs.get(state, INFINITY))
+        return (value + self.heuristic(state, self.maze.goal), value)
+
+    def push(self, state):
+        key = self.key(state)
+        self.keys[state] = key
+        heapq.heappush(self.queue, (key, state))
+
+    def top_key(self):
+        """Returns the smallest key in the queue, dropping outdated entries."""
+        while self.queue:
+            key, state = self.queue[0]
+            if self.keys.get(state) == key:
+                return key
+            heapq.heappop(self.queue)
+        return (INFINITY, INFINITY)
+
+    def update(self, state):
+        """Recomputes rhs of a state and requeues it if it is inconsistent."""
+        if state != self.maze.start:
+            row, col = state
+            if self.maze.walls[row][col]:
+                self.rhs[state] = INFINITY
+            else:
+                self.rhs[state] = min(
+                    (self.g.get(neighbor, INFINITY) + 1
+                     for _, neighbor in self.maze.neighbors(state)),
+                    default=INFINITY
                 )
+        self.keys.pop(state, None)
+        if self.g.get(state, INFINITY) != self.rhs.get(state, INFINITY):
+            self.push(state)
+
+    def toggle(self, state):
+        """Adds or removes the wall at a cell."""
+        if state in (self.maze.start, self.maze.goal):
+            raise Exception("cannot place a wall on the start or goal")
+        row, col = state
+        self.maze.walls[row][col] = not self.maze.walls[row][col]
+        self.update(state)
+        for _, neighbor in self.maze.neighbors(state):
+            self.update(neighbor)
+
+    def plan(self):
+        """Repairs the shortest path after any toggles and returns it."""
+        goal = self.maze.goal
+        self.num_expanded = 0
+        while (self.top_key() < self.key(goal)
+               or self.rhs.get(goal, INFINITY) != self.g.get(goal, INFINITY)):
+            if not self.keys:
+                break
+            _, state = heapq.heappop(self.queue)
+            del self.keys[state]
+            self.num_expanded += 1
+
+            # Lower a distance that got shorter, or reset one that got longer
+            if self.g.get(state, INFINITY) > self.rhs[state]:
+                self.g[state] = self.rhs[state]
+            else:
+                self.g[state] = INFINITY
+                self.update(state)
+            for _, neighbor in self.maze.neighbors(state):
+                self.update(neighbor)
 
-        img.save(filename)
+        if self.g.get(goal, INFINITY) == INFINITY:
+            raise Exception("no solution")
+
+        # Walk back from the goal through neighbors one move closer to start
+        actions = []
+        cells = []
+        state = goal
+        while state != self.maze.start:
+            action, previous = min(
+                self.maze.neighbors(state),
+                key=lambda neighbor: self.g.get(neighbor[1], INFINITY)
+            )
+            actions.append(OPPOSITE[action])
+            cells.append(state)
+            state = previous
+        actions.reverse()
+        cells.reverse()
+        self.maze.solution = (actions, cells)
+        return self.maze.solution
+
+
+class CompactMaze(Maze):
+    """Maze that keeps its walls in a NumPy array of one byte per cell.
+
+    Text files are memory-mapped and parsed a chunk of rows at a time, so
+    each cell must be a single byte. Files ending in .npy hold the binary
+    format written by `save`: a uint8 array of OPEN, WALL, START and GOAL.
+    """
+
+    def __init__(self, filename):
+        import numpy as np
+
+        # Determine height and width of maze, and how to read its rows
+        if filename.endswith(".npy"):
+            cells = np.load(filename, mmap_mode="r")
+            self.height, self.width = cells.shape
+            chunks = (
+                (first, cells[first:first + CHUNK_ROWS])
+                for first in range(0, self.height, CHUNK_ROWS)
+            )
+            open_code, start_code, goal_code = OPEN, START, GOAL
+        else:
+            self.height, self.width, chunks = self.read_lines(filename)
+            open_code, start_code, goal_code = ord(" "), ord("A"), ord("B")
+
+        # Keep track of walls, surrounded by a border of walls so that
+        # neighbors never need a bounds check
+        self.grid = np.ones((self.height + 2, self.width + 2), dtype=np.uint8)
+        self.walls = self.grid[1:-1, 1:-1]
+
+        # Fill in the walls and look for start and goal in the same pass
+        found = {start_code: [], goal_code: []}
+        for first, chunk in chunks:
+            self.walls[first:first + len(chunk)] = chunk != open_code
+            for code, positions in found.items():
+                for index in np.flatnonzero(chunk == code)[:2]:
+                    row, col = divmod(int(index), self.width)
+                    positions.append((first + row, col))
+
+        # Validate start and goal
+        if len(found[start_code]) != 1:
+            raise Exception("maze must have exactly one start point")
+        if len(found[goal_code]) != 1:
+            raise Exception("maze must have exactly one goal")
+        self.start = found[start_code][0]
+        self.goal = found[goal_code][0]
+        self.walls[self.start] = 0
+        self.walls[self.goal] = 0
+
+        # Flat view of the grid, and the offset of each move within it
+        self.cells = self.grid.data.cast("B")
+        stride = self.width + 2
+        self.offsets = [
+            ("up", -stride, -1, 0),
+            ("down", stride, 1, 0),
+            ("left", -1, 0, -1),
+            ("right", 1, 0, 1)
+        ]
+
+        self.solution = None
+
+
+    @staticmethod
+    def read_lines(filename):
+        """Memory-maps a text maze and returns its height, width and rows.
+
+        Rows are yielded as (first row, uint8 array) chunks. Chunks of equal
+        length lines are views into the mapped file; other chunks are copied
+        and padded with open cells.
+        """
+        import numpy as np
+
+        if os.path.getsize(filename) == 0:
+            raise Exception("maze must have exactly one start point")
+        data = np.memmap(filename, dtype=np.uint8, mode="r")
+
+        # Find where each line starts and ends, a chunk of bytes at a time
+        ends = np.concatenate([
+            np.flatnonzero(data[offset:offset + CHUNK_BYTES] == ord("\n")) + offset
+            for offset in range(0, len(data), CHUNK_BYTES)
+        ])
+        starts = np.concatenate(([0], ends + 1))
+        if starts[-1] == len(data):
+            starts = starts[:-1]
+        else:
+            ends = np.append(ends, len(data))
+
+        # Leave out the carriage returns of Windows line endings
+        lengths = ends - starts
+        crlf = (lengths > 0) & (data[np.maximum(ends - 1, 0)] == ord("\r"))
+        lengths -= crlf
+        height = len(starts)
+        width = int(lengths.max())
+
+        def chunks():
+            for first in range(0, height, CHUNK_ROWS):
+                last = min(first + CHUNK_ROWS, height)
+                begin = int(starts[first])
+                stride = width + 1 + int(crlf[first])
+                end = begin + (last - first) * stride
+                if (end <= len(data)
+                        and np.all(lengths[first:last] == width)
+                        and np.all(np.diff(starts[first:last]) == stride)):
+                    chunk = data[begin:end].reshape(last - first, stride)
+                    yield first, chunk[:, :width]
+                else:
+                    chunk = np.full((last - first, width), ord(" "), dtype=np.uint8)
+                    for i in range(first, last):
+                        chunk[i - first, :lengths[i]] = data[starts[i]:starts[i] + lengths[i]]
+                    yield first, chunk
+
+        return height, width, chunks()
+
+
+    def save(self, filename):
+        """Saves the maze to a .npy file in the binary format."""
+        import numpy as np
+
+        cells = np.lib.format.open_memmap(
+            filename, mode="w+", dtype=np.uint8, shape=(self.height, self.width)
+        )
+        for first in range(0, self.height, CHUNK_ROWS):
+            cells[first:first + CHUNK_ROWS] = self.walls[first:first + CHUNK_ROWS]
+        cells[self.start] = START
+        cells[self.goal] = GOAL
+        cells.flush()
+
+
+    def open_cell(self, row, col):
+        return not self.cells[(row + 1) * (self.width + 2) + col + 1]
+
+
+    def memory_per_cell(self):
+        return self.grid.nbytes / (self.height * self.width)
+
+
+    def neighbors(self, state):
+        row, col = state
+        index = (row + 1) * (self.width + 2) + col + 1
+        cells = self.cells
+        return [
+            (action, (row + dr, col + dc))
+            for action, offset, dr, dc in self.offsets
+            if not cells[index + offset]
+        ]
+
+
+def load_maze(filename, compact=False):
+    """Returns the maze in a file, as a CompactMaze if compact is set or the
+    file is in the binary .npy format, which only CompactMaze reads."""
+    if compact or filename.endswith(".npy"):
+        return CompactMaze(filename)
+    return Maze(filename)
+
+
+def solve_file(task):
+    """Solves one maze file for a batch, returning its result record."""
+    filename, strategy, compact, images = task
+    record = {"maze": filename, "strategy": strategy}
+    m = None
+    start = time.perf_counter()
+    try:
+        m = load_maze(filename, compact)
+        start = time.perf_counter()
+        m.solve(strategy)
+        record["solved"] = True
+    except Exception as e:
+        record["solved"] = False
+        record["error"] = str(e)
+    record["seconds"] = time.perf_counter() - start
+    record["explored"] = getattr(m, "num_explored", None)
+    record["path_length"] = len(m.solution[0]) if record["solved"] else None
+
+    if images and record["solved"]:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        m.output_image(os.path.join(images, f"{name}.png"), show_explored=True)
+    return record
+
+
+def solve_batch(filenames, strategy, jobs, output, compact=False, images=None):
+    """Solves maze files across a process pool, writing JSON lines to output."""
+    tasks = [(filename, strategy, compact, images) for filename in filenames]
+    with multiprocessing.Pool(jobs) as pool:
+        for record in pool.imap_unordered(solve_file, tasks, chunksize=4):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Solve a maze, or a directory or glob of mazes in parallel."
+    )
+    parser.add_argument("maze", help="maze file, directory of mazes or glob")
+    parser.add_argument("strategy", nargs="?", default="dfs", choices=STRATEGIES)
+    parser.add_argument("--compact", action="store_true",
+                        help="load text mazes as CompactMaze too, not just .npy")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="worker processes for a batch")
+    parser.add_argument("--output", help="write batch JSON lines here, not stdout")
+    parser.add_argument("--images", metavar="DIR",
+                        help="render an image per solved maze of a batch")
+    args = parser.parse_args()
+
+    # A directory or glob is solved as a batch
+    if os.path.isdir(args.maze):
+        filenames = sorted(
+            glob.glob(os.path.join(args.maze, "*.txt"))
+            + glob.glob(os.path.join(args.maze, "*.npy"))
+        )
+    elif any(c in args.maze for c in "*?["):
+        filenames = sorted(glob.glob(args.maze))
+    else:
+        filenames = None
+    if filenames is not None:
+        if args.images:
+            os.makedirs(args.images, exist_ok=True)
+        if args.output:
+            with open(args.output, "w") as output:
+                solve_batch(filenames, args.strategy, args.jobs, output,
+                            args.compact, args.images)
+        else:
+            solve_batch(filenames, args.strategy, args.jobs, sys.stdout,
+                        args.compact, args.images)
+        return
 
+    m = load_maze(args.maze, args.compact)
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(args.strategy)
+    print("States Explored:", m.num_explored)
+    print("Solution Length:", len(m.solution[0]))
+    print("Memory per Cell:", f"{m.memory_per_cell():.2f} bytes")
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+if __name__ == "__main__":
+    main()
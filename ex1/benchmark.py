@@ -0,0 +1,139 @@
+"""
+Benchmarks model_check methods on reproducible generated knowledge bases.
+
+Usage: python benchmark.py [--sizes N ...] [--methods METHOD ...]
+                           [--processes N] [--split K] [--presimplify]
+                           [--seed SEED] [--output FILE]
+
+Generates puzzles like puzzle.py with N people and N houses (default 3
+through 5), each person in exactly one house and each house holding one
+person, plus a few random clues of who is not where. Checks two queries on
+each: that the first person lives somewhere, which holds and so needs
+every model, and a random symbol, which usually does not and lets a
+method stop early. Writes one JSON record per check, with its wall time
+and its speedup over the serial compiled enumeration that the "parallel"
+method splits across processes.
+
+With --presimplify, each knowledge base is simplified once, its unit facts
+substituted into the queries, before any method runs, and the records also
+hold the size and symbols of the knowledge before and after.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+from logic import *
+
+METHODS = ["enumerate", "compiled", "parallel", "truth_table", "dpll", "cdcl",
+           "resolution"]
+SIZES = [3, 4, 5]
+
+
+def houses(size, rng):
+    """Returns the symbols and knowledge of a puzzle of size people and houses."""
+    symbols = [[Symbol(f"person{p}house{h}") for h in range(size)]
+               for p in range(size)]
+    knowledge = And()
+    for p in range(size):
+        knowledge.add(Or(*symbols[p]))
+        for h in range(size):
+            for other in range(size):
+                if other != h:
+                    knowledge.add(Implication(symbols[p][h], Not(symbols[p][other])))
+                if other != p:
+                    knowledge.add(Implication(symbols[p][h], Not(symbols[other][h])))
+
+    # Clues ruling out a random house for some of the people
+    for p in rng.sample(range(size), size // 2):
+        knowledge.add(Not(symbols[p][rng.randrange(size)]))
+    return [symbol for row in symbols for symbol in row], knowledge
+
+
+def check(knowledge, query, method, processes, split):
+    """Checks a query with a method, returning its measurements."""
+    start = time.perf_counter()
+    if method == "parallel":
+        entailed = parallel_check(knowledge, query, processes, split)
+    else:
+        entailed = model_check(knowledge, query, method)
+    return {
+        "method": method,
+        "entailed": entailed,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model_check methods.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--methods", nargs="+", choices=METHODS,
+                        default=["compiled", "parallel"])
+    parser.add_argument("--processes", type=int, default=None,
+                        help="processes for the parallel method, default all cores")
+    parser.add_argument("--split", type=int, default=None,
+                        help="symbols the parallel method fixes per sub-problem")
+    parser.add_argument("--presimplify", action="store_true",
+                        help="simplify knowledge and substitute its facts first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    # Speedups are against the serial path that the parallel method splits
+    methods = args.methods
+    if "parallel" in methods and "compiled" not in methods:
+        methods = ["compiled"] + methods
+
+    rng = random.Random(args.seed)
+    records = []
+    for size in args.sizes:
+        symbols, knowledge = houses(size, rng)
+        queries = [
+            ("entailed", Or(*symbols[:size])),
+            ("random", rng.choice(symbols))
+        ]
+
+        metrics = {"size": size, "symbols": len(symbols)}
+        if args.presimplify:
+            start = time.perf_counter()
+            facts = dict()
+            simplified = simplify(knowledge, facts)
+            queries = [(name, assign(query, facts)) for name, query in queries]
+            metrics.update({
+                "simplify_seconds": time.perf_counter() - start,
+                "nodes_before": sentence_size(knowledge),
+                "nodes_after": sentence_size(simplified),
+                "symbols_after": len(simplified.symbols()),
+                "facts": len(facts)
+            })
+            knowledge = simplified
+
+        for name, query in queries:
+            serial = None
+            for method in methods:
+                record = dict(metrics, query=name)
+                record.update(check(knowledge, query, method,
+                                    args.processes, args.split))
+                if method == "compiled":
+                    serial = record["seconds"]
+                record["speedup"] = (
+                    serial / record["seconds"]
+                    if serial is not None and record["seconds"] else None
+                )
+                records.append(record)
+                print(f"{size:>4}{name:>10}{method:>13}"
+                      f"{str(record['entailed']):>7}"
+                      f"{record['seconds']:>10.3f}s", file=sys.stderr)
+
+    report = json.dumps(records, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,28 @@
+import heapq
 import itertools
+import multiprocessing
+import os
+import time
+import weakref
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Most symbols a truth table is built for: 2^24 models take 2 MiB per column
+TABLE_SYMBOLS = 24
+
+# Most clauses resolution keeps before handing the check to DPLL instead
+RESOLUTION_CLAUSES = 1000
 
 
 class Sentence():
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    # Immutable sentences, keyed by class and operands, so that structurally
+    # equal sentences are built once and shared
+    interned = weakref.WeakValueDictionary()
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -20,6 +41,30 @@ class Sentence():
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def share(cls, sentence):
+        """Validates an operand, returning the shared sentence to store.
+
+        A conjunction is stored as an immutable copy, since sentences
+        containing it cache their hash and symbols, and the original can
+        still grow.
+        """
+        Sentence.validate(sentence)
+        if isinstance(sentence, And):
+            return sentence.freeze()
+        return sentence
+
+    @classmethod
+    def intern(cls, key):
+        """Returns the interned sentence for key, or a new empty one and
+        whether it still needs its attributes set."""
+        sentence = Sentence.interned.get(key)
+        if sentence is not None:
+            return sentence, False
+        sentence = object.__new__(key[0])
+        Sentence.interned[key] = sentence
+        return sentence, True
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -43,15 +88,24 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        self, new = Sentence.intern((cls, name))
+        if new:
+            self.name = name
+            self._hash = hash(("symbol", name))
+            self._symbols = frozenset((name,))
+        return self
 
-    def __init__(self, name):
-        self.name = name
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
@@ -66,19 +120,29 @@ class Symbol(Sentence):
         return self.name
 
     def symbols(self):
-        return {self.name}
+        return set(self._symbols)
 
 
 class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
+        operand = Sentence.share(operand)
+        self, new = Sentence.intern((cls, operand))
+        if new:
+            self.operand = operand
+            self._hash = hash(("not", hash(operand)))
+            self._symbols = operand._symbols
+        return self
+
+    def __reduce__(self):
+        return (Not, (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        return self._hash
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -90,22 +154,38 @@ class Not(Sentence):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
     def symbols(self):
-        return self.operand.symbols()
+        return set(self._symbols)
 
 
 class And(Sentence):
+    """A conjunction, which unlike other sentences can grow with add().
+
+    Its hash and symbols are cached only until the next add(). Other
+    sentences store it as a frozen copy, shared with equal conjunctions,
+    which cannot grow, so later additions to it do not change them.
+    """
+    __slots__ = ("conjuncts", "frozen")
+
     def __init__(self, *conjuncts):
-        for conjunct in conjuncts:
-            Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = [Sentence.share(conjunct) for conjunct in conjuncts]
+        self.frozen = False
+        self._hash = None
+        self._symbols = None
+
+    def __reduce__(self):
+        return (And, tuple(self.conjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +194,25 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        if self.frozen:
+            raise Exception("cannot add to a conjunction inside another sentence")
+        self.conjuncts.append(Sentence.share(conjunct))
+        self._hash = None
+        self._symbols = None
+
+    def freeze(self):
+        """Returns the immutable conjunction shared by all conjunctions equal
+        to this one now, leaving this one free to grow."""
+        if self.frozen:
+            return self
+        key = (And,) + tuple(self.conjuncts)
+        shared = Sentence.interned.get(key)
+        if shared is None:
+            shared = And(*self.conjuncts)
+            shared.frozen = True
+            shared.symbol_set()
+            Sentence.interned[key] = shared
+        return shared
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +223,41 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset().union(
+                *[conjunct._symbols for conjunct in self.conjuncts]
+            )
+        return self._symbols
+
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set(self.symbol_set())
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
-        for disjunct in disjuncts:
-            Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
+        disjuncts = tuple(Sentence.share(disjunct) for disjunct in disjuncts)
+        self, new = Sentence.intern((cls,) + disjuncts)
+        if new:
+            self.disjuncts = disjuncts
+            self._hash = hash(
+                ("or", tuple(hash(disjunct) for disjunct in disjuncts))
+            )
+            self._symbols = frozenset().union(
+                *[disjunct._symbols for disjunct in disjuncts]
+            )
+        return self
+
+    def __reduce__(self):
+        return (Or, self.disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        return self._hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -158,23 +273,31 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set(self._symbols)
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
-        Sentence.validate(antecedent)
-        Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
+        antecedent = Sentence.share(antecedent)
+        consequent = Sentence.share(consequent)
+        self, new = Sentence.intern((cls, antecedent, consequent))
+        if new:
+            self.antecedent = antecedent
+            self.consequent = consequent
+            self._hash = hash(("implies", hash(antecedent), hash(consequent)))
+            self._symbols = antecedent._symbols | consequent._symbols
+        return self
+
+    def __reduce__(self):
+        return (Implication, (self.antecedent, self.consequent))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return self._hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -189,23 +312,31 @@ class Implication(Sentence):
         return f"{antecedent} => {consequent}"
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        return set(self._symbols)
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
-        Sentence.validate(left)
-        Sentence.validate(right)
-        self.left = left
-        self.right = right
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
+        left = Sentence.share(left)
+        right = Sentence.share(right)
+        self, new = Sentence.intern((cls, left, right))
+        if new:
+            self.left = left
+            self.right = right
+            self._hash = hash(("biconditional", hash(left), hash(right)))
+            self._symbols = left._symbols | right._symbols
+        return self
+
+    def __reduce__(self):
+        return (Biconditional, (self.left, self.right))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return self._hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -222,11 +353,51 @@ class Biconditional(Sentence):
         return f"{left} <=> {right}"
 
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+        return set(self._symbols)
+
+
+def model_check(knowledge, query, method="enumerate", presimplify=False,
+                stats=None):
+    """Checks if knowledge base entails query.
+
+    `method` is "enumerate", which checks the query in every model of the
+    knowledge base, "dpll", which checks that knowledge ∧ ¬query has no
+    model with the DPLL satisfiability procedure, "cdcl", which does the
+    same with the clause learning CDCL solver, "resolution", which derives
+    a contradiction from knowledge ∧ ¬query, "compiled", which enumerates
+    models as integers and evaluates compiled programs of both, "parallel",
+    which splits that enumeration across processes, or "truth_table",
+    which evaluates both in all models at once with NumPy.
+
+    With presimplify, knowledge is first simplified, and the unit facts it
+    asserts are substituted into the query and left out of the knowledge,
+    so fewer symbols reach the method.
+
+    With method "cdcl", a SolverStats passed as stats is filled with the
+    counters and timing of the search.
+    """
+    if presimplify:
+        facts = dict()
+        knowledge = simplify(knowledge, facts)
+        if is_false(knowledge):
+            return True
+        query = assign(query, facts)
+
+    if method == "dpll":
+        return dpll_check(knowledge, query)
+    if method == "cdcl":
+        return cdcl_check(knowledge, query, stats)
+    if method == "resolution":
+        return resolution_check(knowledge, query)
+    if method == "compiled":
+        return compiled_check(knowledge, query)
+    if method == "parallel":
+        return parallel_check(knowledge, query)
+    if method == "truth_table":
+        symbols = set.union(knowledge.symbols(), query.symbols())
+        return TruthTable(symbols).entails(knowledge, query)
+    if method != "enumerate":
+        raise ValueError(f"unknown method {method}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +432,1243 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class Program():
+    """A sentence compiled to a flat postfix program over symbol ids.
+
+    Each symbol gets a dense integer id, and a model is an integer whose
+    bit i is the value of the symbol with id i. The program is a list of
+    operations on a stack of 0s and 1s. Interpreting it one operation at a
+    time costs about as much as Sentence.evaluate, so it is also translated
+    into a single Python expression, compiled once, which evaluates with
+    short-circuiting and no function call per node. Sentences nested too
+    deeply for Python to compile are interpreted instead.
+    """
+
+    # Operations, each with one argument: a symbol id, or how many operands
+    # a conjunction or disjunction pops
+    SYMBOL, NOT, AND, OR, IMPLIES, IFF = range(6)
+
+    def __init__(self, sentence, ids=None):
+
+        # Ids by symbol name, shared with other programs given the same ids
+        self.ids = dict() if ids is None else ids
+        self.operations = []
+        self.arguments = []
+        self.compile(sentence)
+        self.stack = [0] * len(self.operations)
+
+        # The source only holds integers, operators and the name m
+        try:
+            self.function = eval(f"lambda m: {self.source()}", {})
+        except (SyntaxError, RecursionError, MemoryError):
+            self.function = None
+
+    def compile(self, sentence):
+        """Appends operations leaving the value of sentence on the stack."""
+        if isinstance(sentence, Symbol):
+            self.operations.append(Program.SYMBOL)
+            self.arguments.append(self.ids.setdefault(sentence.name, len(self.ids)))
+            return
+        if isinstance(sentence, Not):
+            operands, operation, argument = [sentence.operand], Program.NOT, 0
+        elif isinstance(sentence, And):
+            operands = sentence.conjuncts
+            operation, argument = Program.AND, len(operands)
+        elif isinstance(sentence, Or):
+            operands = sentence.disjuncts
+            operation, argument = Program.OR, len(operands)
+        elif isinstance(sentence, Implication):
+            operands = [sentence.antecedent, sentence.consequent]
+            operation, argument = Program.IMPLIES, 0
+        elif isinstance(sentence, Biconditional):
+            operands = [sentence.left, sentence.right]
+            operation, argument = Program.IFF, 0
+        else:
+            raise TypeError("must be a logical sentence")
+        for operand in operands:
+            self.compile(operand)
+        self.operations.append(operation)
+        self.arguments.append(argument)
+
+    def source(self):
+        """Returns a Python expression of the program in model m."""
+        stack = []
+        for operation, argument in zip(self.operations, self.arguments):
+            if operation == Program.SYMBOL:
+                stack.append(f"m >> {argument} & 1")
+            elif operation == Program.NOT:
+                stack.append(f"not ({stack.pop()})")
+            elif operation in (Program.AND, Program.OR):
+                operands = [stack.pop() for _ in range(argument)][::-1]
+                if not operands:
+                    stack.append("1" if operation == Program.AND else "0")
+                else:
+                    joiner = " and " if operation == Program.AND else " or "
+                    stack.append(joiner.join(f"({operand})" for operand in operands))
+            else:
+                right, left = stack.pop(), stack.pop()
+                if operation == Program.IMPLIES:
+                    stack.append(f"not ({left}) or ({right})")
+                else:
+                    stack.append(f"(not ({left})) == (not ({right}))")
+        return stack.pop()
+
+    def bitmask(self, model):
+        """Returns the integer model of a model given as a dict."""
+        return sum(1 << id for name, id in self.ids.items() if model[name])
+
+    def evaluate(self, model):
+        """Evaluates the program in an integer model."""
+        if self.function is not None:
+            return bool(self.function(model))
+        return self.interpret(model)
+
+    def interpret(self, model):
+        """Evaluates the program one operation at a time."""
+        stack = self.stack
+        top = -1
+        for operation, argument in zip(self.operations, self.arguments):
+            if operation == Program.SYMBOL:
+                top += 1
+                stack[top] = model >> argument & 1
+            elif operation == Program.NOT:
+                stack[top] ^= 1
+            elif operation == Program.AND:
+                value = min(stack[top - argument + 1:top + 1], default=1)
+                top -= argument - 1
+                stack[top] = value
+            elif operation == Program.OR:
+                value = max(stack[top - argument + 1:top + 1], default=0)
+                top -= argument - 1
+                stack[top] = value
+            elif operation == Program.IMPLIES:
+                top -= 1
+                stack[top] = (stack[top] ^ 1) | stack[top + 1]
+            else:
+                top -= 1
+                stack[top] ^= stack[top + 1] ^ 1
+        return stack[top] == 1
+
+
+def check_prefix(task):
+    """Checks if knowledge entails query in the models whose first symbols
+    have given values, evaluating compiled programs.
+
+    task is (knowledge, query, names, split, prefix): the symbol names in
+    order, how many of them are fixed, and their values as the bits of an
+    integer.
+    """
+    knowledge, query, names, split, prefix = task
+    ids = {name: id for id, name in enumerate(names)}
+    knowledge = Program(knowledge, ids)
+    query = Program(query, ids)
+    for rest in range(2 ** (len(names) - split)):
+        model = rest << split | prefix
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            return False
+    return True
+
+
+def compiled_check(knowledge, query):
+    """Checks if knowledge base entails query, enumerating models as
+    integers and evaluating compiled programs."""
+    names = sorted(set.union(knowledge.symbols(), query.symbols()))
+    return check_prefix((knowledge, query, names, 0, 0))
+
+
+def parallel_check(knowledge, query, processes=None, split=None):
+    """Checks if knowledge base entails query on a pool of processes.
+
+    Fixes the first split symbols to each of their 2^split combinations,
+    by default enough for four sub-problems per process, and checks each
+    with check_prefix, stopping at the first one with a model of knowledge
+    where query is false. Scripts using this on a platform that spawns
+    processes must guard their top level with if __name__ == "__main__".
+    """
+    names = sorted(set.union(knowledge.symbols(), query.symbols()))
+    processes = processes or os.cpu_count()
+    if split is None:
+        split = (4 * processes - 1).bit_length()
+    split = min(split, len(names))
+
+    tasks = [(knowledge, query, names, split, prefix)
+             for prefix in range(2 ** split)]
+    with multiprocessing.Pool(processes) as pool:
+        for entailed in pool.imap_unordered(check_prefix, tasks):
+            if not entailed:
+                return False
+    return True
+
+
+def is_true(sentence):
+    """Checks if sentence is the constant true, an empty conjunction."""
+    return isinstance(sentence, And) and not sentence.conjuncts
+
+
+def is_false(sentence):
+    """Checks if sentence is the constant false, an empty disjunction."""
+    return isinstance(sentence, Or) and not sentence.disjuncts
+
+
+def negate(sentence):
+    """Returns the negation of sentence, without double negation."""
+    if isinstance(sentence, Not):
+        return sentence.operand
+    if is_true(sentence):
+        return Or()
+    if is_false(sentence):
+        return And()
+    return Not(sentence)
+
+
+def sentence_size(sentence):
+    """Returns the number of nodes in sentence."""
+    if isinstance(sentence, Not):
+        return 1 + sentence_size(sentence.operand)
+    if isinstance(sentence, And):
+        return 1 + sum(sentence_size(c) for c in sentence.conjuncts)
+    if isinstance(sentence, Or):
+        return 1 + sum(sentence_size(d) for d in sentence.disjuncts)
+    if isinstance(sentence, Implication):
+        return (1 + sentence_size(sentence.antecedent)
+                + sentence_size(sentence.consequent))
+    if isinstance(sentence, Biconditional):
+        return 1 + sentence_size(sentence.left) + sentence_size(sentence.right)
+    return 1
+
+
+def assign(sentence, values):
+    """Returns sentence simplified, with the symbols in values, a dict from
+    names to booleans, replaced by their values.
+
+    Flattens nested conjunctions and disjunctions, removes duplicate and
+    constant operands and double negation, and folds any operation whose
+    value a constant or a complementary pair of operands decides. True is
+    And() and false is Or().
+    """
+    if isinstance(sentence, Symbol):
+        if sentence.name in values:
+            return And() if values[sentence.name] else Or()
+        return sentence
+    if isinstance(sentence, Not):
+        return negate(assign(sentence.operand, values))
+
+    if isinstance(sentence, (And, Or)):
+        is_and = isinstance(sentence, And)
+        kind = And if is_and else Or
+        operands = sentence.conjuncts if is_and else sentence.disjuncts
+
+        # Operands in order without duplicates, lifting nested ones of the same kind
+        flat = dict()
+        for operand in operands:
+            operand = assign(operand, values)
+            if isinstance(operand, kind):
+                nested = operand.conjuncts if is_and else operand.disjuncts
+                if not nested:
+                    continue
+                flat.update(dict.fromkeys(nested))
+            elif is_false(operand) if is_and else is_true(operand):
+                return operand
+            else:
+                flat[operand] = None
+
+        # An operand and its negation decide the value
+        if any(negate(operand) in flat for operand in flat):
+            return Or() if is_and else And()
+        if len(flat) == 1:
+            return next(iter(flat))
+        return kind(*flat)
+
+    if isinstance(sentence, Implication):
+        antecedent = assign(sentence.antecedent, values)
+        consequent = assign(sentence.consequent, values)
+        if is_false(antecedent) or is_true(consequent) or antecedent == consequent:
+            return And()
+        if is_true(antecedent):
+            return consequent
+        if is_false(consequent):
+            return negate(antecedent)
+        return Implication(antecedent, consequent)
+
+    if isinstance(sentence, Biconditional):
+        left = assign(sentence.left, values)
+        right = assign(sentence.right, values)
+        if left == right:
+            return And()
+        if left == negate(right):
+            return Or()
+        for constant, other in ((left, right), (right, left)):
+            if is_true(constant):
+                return other
+            if is_false(constant):
+                return negate(other)
+        return Biconditional(left, right)
+
+    raise TypeError("must be a logical sentence")
+
+
+def simplify(sentence, facts=None):
+    """Returns an equivalent, simplified sentence.
+
+    Simplifies with assign, then propagates unit facts: each conjunct that
+    is a symbol or its negation is substituted into the other conjuncts,
+    which are simplified again, until no new facts appear. The facts are
+    kept as the first conjuncts, unless facts is a dict, in which case they
+    are added to it instead and the sentence returned only holds the rest.
+    """
+    values = dict()
+    sentence = assign(sentence, values)
+    while not is_false(sentence):
+        conjuncts = sentence.conjuncts if isinstance(sentence, And) else [sentence]
+        found = dict()
+        rest = []
+        for conjunct in conjuncts:
+            literal = conjunct.operand if isinstance(conjunct, Not) else conjunct
+            if isinstance(literal, Symbol):
+                value = literal is conjunct
+                if found.get(literal.name, value) != value:
+                    return Or()
+                found[literal.name] = value
+            else:
+                rest.append(conjunct)
+        if not found:
+            break
+        values.update(found)
+        sentence = assign(And(*rest), values)
+
+    if is_false(sentence):
+        return sentence
+    rest = sentence.conjuncts if isinstance(sentence, And) else [sentence]
+    if facts is not None:
+        facts.update(values)
+        return And(*rest)
+    units = [Symbol(name) if value else Not(Symbol(name))
+             for name, value in values.items()]
+    return And(*units, *rest)
+
+
+def cnf_clauses(sentence, ids=None):
+    """Returns the clauses of a sentence in conjunctive normal form.
+
+    Each clause is a frozenset of integer literals: the id of a symbol in
+    `ids`, negated when the symbol is negated. Symbols missing from `ids`
+    are added to it. Disjunctions are distributed over conjunctions, so
+    the number of clauses can grow exponentially.
+    """
+    if ids is None:
+        ids = dict()
+
+    def product(left, right):
+        """Returns the clauses of the disjunction of two clause lists."""
+        result = []
+        for a in left:
+            for b in right:
+                clause = a | b
+                if not any(-literal in clause for literal in clause):
+                    result.append(clause)
+        return result
+
+    def disjunction(operands):
+        result = [frozenset()]
+        for clauses in operands:
+            result = product(result, clauses)
+        return result
+
+    def convert(sentence, positive):
+        """Returns the clauses of sentence, or of its negation."""
+        if isinstance(sentence, Symbol):
+            literal = ids.setdefault(sentence.name, len(ids) + 1)
+            return [frozenset([literal if positive else -literal])]
+        if isinstance(sentence, Not):
+            return convert(sentence.operand, not positive)
+        if isinstance(sentence, And):
+            operands = [convert(c, positive) for c in sentence.conjuncts]
+            if positive:
+                return [clause for clauses in operands for clause in clauses]
+            return disjunction(operands)
+        if isinstance(sentence, Or):
+            operands = [convert(d, positive) for d in sentence.disjuncts]
+            if positive:
+                return disjunction(operands)
+            return [clause for clauses in operands for clause in clauses]
+        if isinstance(sentence, Implication):
+            if positive:
+                return product(convert(sentence.antecedent, False),
+                               convert(sentence.consequent, True))
+            return (convert(sentence.antecedent, True)
+                    + convert(sentence.consequent, False))
+        if isinstance(sentence, Biconditional):
+            left, right = sentence.left, sentence.right
+            return (product(convert(left, not positive), convert(right, True))
+                    + product(convert(left, positive), convert(right, False)))
+        raise TypeError("must be a logical sentence")
+
+    return convert(sentence, True)
+
+
+class Tseitin():
+    """Converts sentences to clauses with the Tseitin transformation.
+
+    Every compound subsentence gets a new variable defined to be equivalent
+    to it, so the clauses grow linearly with the sentences. Symbols and
+    subsentences already converted keep their variables, which are shared
+    by all sentences given to the same converter. Literals are integers:
+    a variable, or its negation.
+    """
+
+    def __init__(self):
+
+        # Variable of each symbol, by name, and of each compound subsentence
+        self.ids = dict()
+        self.variables = dict()
+
+        # Clauses defining the new variables and asserting added sentences
+        self.clauses = []
+        self.count = 0
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def symbol(self, name):
+        """Returns the variable of a symbol."""
+        if name not in self.ids:
+            self.ids[name] = self.new_variable()
+        return self.ids[name]
+
+    def constant(self, value):
+        """Returns a literal that is always true, or always false."""
+        if None not in self.variables:
+            self.variables[None] = self.new_variable()
+            self.clauses.append((self.variables[None],))
+        return self.variables[None] if value else -self.variables[None]
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to a sentence."""
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.variables:
+            return self.variables[sentence]
+
+        if isinstance(sentence, (And, Or)):
+            is_and = isinstance(sentence, And)
+            operands = sentence.conjuncts if is_and else sentence.disjuncts
+            if not operands:
+                return self.constant(is_and)
+            if len(operands) == 1:
+                return self.literal(operands[0])
+            literals = [self.literal(operand) for operand in operands]
+
+            # v ↔ (l1 ∧ ... ∧ ln), or v ↔ (l1 ∨ ... ∨ ln) by De Morgan
+            sign = 1 if is_and else -1
+            v = self.new_variable()
+            for literal in literals:
+                self.clauses.append((-sign * v, sign * literal))
+            self.clauses.append(
+                (sign * v,) + tuple(-sign * literal for literal in literals)
+            )
+
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+
+            # v ↔ (¬a ∨ b)
+            v = self.new_variable()
+            self.clauses.extend([(-v, -a, b), (v, a), (v, -b)])
+
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+
+            # v ↔ (a ↔ b)
+            v = self.new_variable()
+            self.clauses.extend([
+                (-v, -a, b), (-v, a, -b), (v, a, b), (v, -a, -b)
+            ])
+
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.variables[sentence] = v
+        return v
+
+    def add(self, sentence):
+        """Adds clauses asserting that a sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                tuple(self.literal(disjunct) for disjunct in sentence.disjuncts)
+            )
+        else:
+            self.clauses.append((self.literal(sentence),))
+
+
+def dpll_satisfiable(clauses):
+    """Returns a satisfying assignment of clauses, or None if there is none.
+
+    The assignment maps variables to booleans, leaving out variables whose
+    value does not matter.
+    """
+
+    def assign(clauses, literal):
+        """Returns clauses simplified by making literal true."""
+        return [clause - {-literal} for clause in clauses if literal not in clause]
+
+    def dpll(clauses, assignment):
+        while True:
+
+            # An empty clause cannot be satisfied
+            if any(not clause for clause in clauses):
+                return None
+
+            # Unit propagation: a clause of one literal forces its value
+            units = [clause for clause in clauses if len(clause) == 1]
+            if units:
+                literal = next(iter(units[0]))
+                assignment[abs(literal)] = literal > 0
+                clauses = assign(clauses, literal)
+                continue
+
+            # Pure literal elimination: a literal never negated can be made true
+            literals = set().union(*clauses)
+            pure = [literal for literal in literals if -literal not in literals]
+            if pure:
+                for literal in pure:
+                    assignment[abs(literal)] = literal > 0
+                    clauses = assign(clauses, literal)
+                continue
+            break
+
+        if not clauses:
+            return assignment
+
+        # Branch on a literal of a shortest clause
+        literal = next(iter(min(clauses, key=len)))
+        for choice in (literal, -literal):
+            result = dpll(assign(clauses, choice),
+                          {**assignment, abs(choice): choice > 0})
+            if result is not None:
+                return result
+        return None
+
+    return dpll([frozenset(clause) for clause in clauses], dict())
+
+
+def query_all(knowledge, symbols):
+    """Returns, for each of symbols, whether knowledge entails it.
+
+    Answers are "YES" if knowledge entails the symbol, "NO" if it entails
+    its negation and "MAYBE" otherwise. A knowledge base with no models
+    entails everything, so every answer is "YES". The knowledge base is
+    encoded once, and each model found rules out every symbol it disagrees
+    with, so only symbols that could be forced need a search of their own,
+    by CDCL with the opposite value as a unit clause.
+    """
+    encoder = Tseitin()
+    encoder.add(knowledge)
+    model = CDCL(encoder.clauses).solve()
+    if model is None:
+        return {symbol: "YES" for symbol in symbols}
+
+    # Symbols keeping the value of every model found so far
+    answers = {symbol: "MAYBE" for symbol in symbols}
+    candidates = dict()
+    for symbol in symbols:
+        variable = encoder.ids.get(symbol.name)
+        if variable in model:
+            candidates[symbol] = variable if model[variable] else -variable
+
+    while candidates:
+        symbol, literal = candidates.popitem()
+
+        # Symbol is forced if no model gives it the opposite value
+        model = CDCL(encoder.clauses + [(-literal,)]).solve()
+        if model is None:
+            answers[symbol] = "YES" if literal > 0 else "NO"
+            continue
+        candidates = {
+            symbol: literal for symbol, literal in candidates.items()
+            if model.get(abs(literal)) == (literal > 0)
+        }
+    return answers
+
+
+def propagate(clauses, assignment):
+    """Makes the literal of each unit clause true until none are left.
+
+    Records the values in assignment, and returns the clauses that remain
+    unsatisfied, without the literals made false, or None if one of them
+    can no longer be satisfied.
+    """
+    while True:
+        if any(not clause for clause in clauses):
+            return None
+        unit = next((clause for clause in clauses if len(clause) == 1), None)
+        if unit is None:
+            return clauses
+        literal = next(iter(unit))
+        assignment[abs(literal)] = literal > 0
+        clauses = [clause - {-literal} for clause in clauses
+                   if literal not in clause]
+
+
+def variables(clauses):
+    """Returns the set of variables in clauses."""
+    return {abs(literal) for clause in clauses for literal in clause}
+
+
+def models(knowledge, symbols=None):
+    """Yields the models of knowledge one at a time.
+
+    Each model is a dict from the name of each of symbols, by default those
+    of knowledge, to its value; with fewer symbols, each assignment of them
+    that some model of knowledge extends is yielded once. Branches on one
+    symbol at a time, pruning assignments that unit propagation shows
+    knowledge cannot satisfy.
+    """
+    encoder = Tseitin()
+    encoder.add(knowledge)
+    if symbols is None:
+        names = sorted(knowledge.symbols())
+    else:
+        names = [symbol.name for symbol in symbols]
+    ids = [encoder.symbol(name) for name in names]
+
+    def search(clauses, assignment, i):
+        while i < len(ids) and ids[i] in assignment:
+            i += 1
+        if i == len(ids):
+
+            # Only variables defined by the symbols can be left
+            if dpll_satisfiable(clauses) is not None:
+                yield {name: assignment.get(id, False)
+                       for name, id in zip(names, ids)}
+            return
+        for literal in (ids[i], -ids[i]):
+            choice = {**assignment, ids[i]: literal > 0}
+            remaining = propagate(clauses + [frozenset((literal,))], choice)
+            if remaining is not None:
+                yield from search(remaining, choice, i + 1)
+
+    assignment = dict()
+    clauses = propagate([frozenset(clause) for clause in encoder.clauses],
+                        assignment)
+    if clauses is not None:
+        yield from search(clauses, assignment, 0)
+
+
+class ModelCounter():
+    """Counts the models of a knowledge base without enumerating them.
+
+    Counts the satisfying assignments of its Tseitin clauses, which has the
+    same count since every new variable is defined by the symbols. Clauses
+    that share no variables are counted apart and their counts multiplied,
+    and the count of each such component is cached, so counts under
+    different conditions reuse each other's work.
+
+    Symbols, by default those of knowledge, must include all of them.
+    """
+
+    def __init__(self, knowledge, symbols=None):
+        self.encoder = Tseitin()
+        self.encoder.add(knowledge)
+        if symbols is None:
+            self.names = sorted(knowledge.symbols())
+        else:
+            self.names = [symbol.name for symbol in symbols]
+            missing = knowledge.symbols() - set(self.names)
+            if missing:
+                raise ValueError(
+                    f"symbols {', '.join(sorted(missing))} not counted"
+                )
+
+        # Symbols knowledge does not mention double every count
+        for name in self.names:
+            self.encoder.symbol(name)
+        self.clauses = [frozenset(clause) for clause in self.encoder.clauses]
+        self.cache = dict()
+
+    def count(self, given=None):
+        """Returns how many models knowledge has, restricted to those
+        agreeing with given, a dict from symbol names to values."""
+        units = []
+        for name, value in (given or dict()).items():
+            if name not in self.encoder.ids:
+                raise ValueError(f"unknown symbol {name}")
+            id = self.encoder.ids[name]
+            units.append(frozenset((id if value else -id,)))
+        assignment = dict()
+        clauses = propagate(self.clauses + units, assignment)
+        if clauses is None:
+            return 0
+        free = self.encoder.count - len(assignment) - len(variables(clauses))
+        return 2 ** free * self.count_clauses(clauses)
+
+    def count_clauses(self, clauses):
+        """Returns how many assignments of the variables in clauses
+        satisfy them all."""
+        count = 1
+        for component in self.components(clauses):
+            key = frozenset(component)
+            if key not in self.cache:
+                self.cache[key] = self.count_component(component)
+            count *= self.cache[key]
+            if not count:
+                break
+        return count
+
+    def count_component(self, clauses):
+        """Returns the count of connected clauses, branching on the
+        variable that occurs most often."""
+        occurrences = dict()
+        for clause in clauses:
+            for literal in clause:
+                occurrences[abs(literal)] = occurrences.get(abs(literal), 0) + 1
+        variable = max(occurrences, key=occurrences.get)
+
+        count = 0
+        for literal in (variable, -variable):
+            assignment = dict()
+            remaining = propagate(clauses + [frozenset((literal,))], assignment)
+            if remaining is None:
+                continue
+            free = (len(occurrences) - len(assignment)
+                    - len(variables(remaining)))
+            count += 2 ** free * self.count_clauses(remaining)
+        return count
+
+    @staticmethod
+    def components(clauses):
+        """Returns the groups of clauses connected by shared variables."""
+        by_variable = dict()
+        for clause in clauses:
+            for literal in clause:
+                by_variable.setdefault(abs(literal), []).append(clause)
+
+        components = []
+        done = set()
+        for clause in clauses:
+            if clause in done:
+                continue
+            done.add(clause)
+            component = [clause]
+            for current in component:
+                for literal in current:
+                    for other in by_variable[abs(literal)]:
+                        if other not in done:
+                            done.add(other)
+                            component.append(other)
+            components.append(component)
+        return components
+
+    def marginals(self):
+        """Returns the number of models of knowledge, and per symbol how
+        many of them make the symbol true."""
+        return self.count(), {
+            name: self.count({name: True}) for name in self.names
+        }
+
+
+def count_models(knowledge, symbols=None):
+    """Returns how many models knowledge has over symbols, by default its
+    own, without enumerating them. Symbols must include all of knowledge's."""
+    return ModelCounter(knowledge, symbols).count()
+
+
+def dpll_check(knowledge, query):
+    """Checks if knowledge base entails query, using DPLL."""
+    encoder = Tseitin()
+    encoder.add(knowledge)
+    encoder.add(Not(query))
+    return dpll_satisfiable(encoder.clauses) is None
+
+
+class SolverStats():
+    """Counters and timings of the last search run by CDCL.solve."""
+
+    def __init__(self):
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+        self.learned = 0
+        self.restarts = 0
+        self.seconds = 0.0
+
+    def per_second(self, count):
+        return count / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        stats = dict(vars(self))
+        for name in ("decisions", "propagations", "conflicts"):
+            stats[f"{name}_per_second"] = self.per_second(getattr(self, name))
+        return stats
+
+
+def luby(i):
+    """Returns the i-th term, from 0, of the Luby sequence 1 1 2 1 1 2 4 ..."""
+    size, exponent = 1, 0
+    while size < i + 1:
+        size = 2 * size + 1
+        exponent += 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        exponent -= 1
+        i %= size
+    return 2 ** exponent
+
+
+class CDCL():
+    """Conflict-driven clause learning satisfiability solver.
+
+    Each clause watches two of its literals, the first two in its list, and
+    is only visited when one of them becomes false. A conflict is analyzed
+    back to its first unique implication point, and the learned clause
+    makes the search jump back to the level where it becomes unit. Decisions
+    pick the variable with the highest activity (VSIDS), which grows each
+    time a variable takes part in a conflict and decays over time, with the
+    value it last had. The search restarts after a number of conflicts
+    following the Luby sequence. Periodically, the half of the learned
+    clauses spanning the most decision levels is deleted.
+    """
+
+    # Conflicts before the first restart, and decay of variable activity
+    RESTART_CONFLICTS = 100
+    DECAY = 0.95
+
+    # Conflicts between deletions of learned clauses
+    REDUCE_CONFLICTS = 2000
+
+    def __init__(self, clauses):
+        self.clauses = []
+        self.units = []
+        self.empty = False
+        self.count = 0
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+            self.count = max([self.count] + [abs(literal) for literal in clause])
+            if any(-literal in clause for literal in clause):
+                continue
+            if not clause:
+                self.empty = True
+            elif len(clause) == 1:
+                self.units.append(clause[0])
+            else:
+                self.clauses.append(clause)
+        self.stats = SolverStats()
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false and 0 if unassigned."""
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def watch(self, index):
+        clause = self.clauses[index]
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+
+    def propagate(self):
+        """Assigns literals forced by unit clauses, returning the index of
+        a clause made false, or None."""
+        values = self.values
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watchers = self.watches.get(false, [])
+            kept = []
+            for i, index in enumerate(watchers):
+                clause = self.clauses[index]
+                if clause is None:
+                    continue
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                value = values[first] if first > 0 else -values[-first]
+                if value == 1:
+                    kept.append(index)
+                    continue
+
+                # Watch another literal that is not false, if there is one
+                for j in range(2, len(clause)):
+                    other = clause[j]
+                    if (values[other] if other > 0 else -values[-other]) != -1:
+                        clause[1], clause[j] = other, clause[1]
+                        self.watches.setdefault(other, []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if value == -1:
+                        kept.extend(watchers[i + 1:])
+                        self.watches[false] = kept
+                        return index
+                    self.assign(clause[0], index)
+                    self.stats.propagations += 1
+            self.watches[false] = kept
+        return None
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-self.activity[v], v) for v in range(1, self.count + 1)
+                          if not self.values[v]]
+            heapq.heapify(self.order)
+        heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def analyze(self, index):
+        """Returns the clause learned from a conflict, its asserting
+        literal first."""
+        level = len(self.limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        clause = self.clauses[index]
+        literal = None
+        position = len(self.trail) - 1
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if self.levels[variable] == level:
+                        pending += 1
+                    else:
+                        learned.append(other)
+
+            # Follow the latest literal of the conflict back to its reason
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            seen.discard(abs(literal))
+            pending -= 1
+            if not pending:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        return learned
+
+    def reduce(self):
+        """Deletes the half of the learned clauses with the most distinct
+        decision levels, keeping binary clauses and reasons on the trail."""
+        locked = {self.reasons[abs(literal)] for literal in self.trail}
+        candidates = sorted(
+            (index for index in self.glue
+             if len(self.clauses[index]) > 2 and index not in locked),
+            key=lambda index: self.glue[index]
+        )
+        for index in candidates[len(candidates) // 2:]:
+            self.clauses[index] = None
+            del self.glue[index]
+
+    def backtrack(self, level):
+        if len(self.limits) <= level:
+            return
+        for literal in self.trail[self.limits[level]:]:
+            variable = abs(literal)
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            self.phases[variable] = literal > 0
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[self.limits[level]:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable of highest activity, or None."""
+        while self.order:
+            _, variable = heapq.heappop(self.order)
+            if not self.values[variable]:
+                return variable
+        return None
+
+    def solve(self):
+        """Returns a satisfying assignment of the clauses, or None if there
+        is none. The assignment maps every variable to a boolean."""
+        self.stats = SolverStats()
+        start = time.perf_counter()
+        try:
+            return self.search()
+        finally:
+            self.stats.seconds = time.perf_counter() - start
+
+    def search(self):
+        size = self.count + 1
+        self.values = [0] * size
+        self.levels = [0] * size
+        self.reasons = [None] * size
+        self.phases = [False] * size
+        self.activity = [0.0] * size
+        self.increment = 1.0
+        self.order = [(0.0, variable) for variable in range(1, size)]
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        self.watches = dict()
+        for index in range(len(self.clauses)):
+            self.watch(index)
+
+        # Distinct decision levels in each learned clause, by index
+        self.glue = dict()
+
+        if self.empty:
+            return None
+        for literal in self.units:
+            if self.value(literal) == -1:
+                return None
+            if not self.value(literal):
+                self.assign(literal, None)
+
+        conflicts = 0
+        while True:
+            index = self.propagate()
+            if index is not None:
+                self.stats.conflicts += 1
+                if not self.limits:
+                    return None
+
+                # Learn a clause and jump back to where it becomes unit
+                learned = self.analyze(index)
+                self.stats.learned += 1
+                if len(learned) == 1:
+                    self.backtrack(0)
+                    self.assign(learned[0], None)
+                else:
+                    i = max(range(1, len(learned)),
+                            key=lambda i: self.levels[abs(learned[i])])
+                    learned[1], learned[i] = learned[i], learned[1]
+                    self.backtrack(self.levels[abs(learned[1])])
+                    self.clauses.append(learned)
+                    index = len(self.clauses) - 1
+                    self.glue[index] = len(
+                        {self.levels[abs(literal)] for literal in learned}
+                    )
+                    self.watch(index)
+                    self.assign(learned[0], index)
+                self.increment /= self.DECAY
+                if not self.stats.conflicts % self.REDUCE_CONFLICTS:
+                    self.reduce()
+
+                conflicts += 1
+                if conflicts >= self.RESTART_CONFLICTS * luby(self.stats.restarts):
+                    self.backtrack(0)
+                    self.stats.restarts += 1
+                    conflicts = 0
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return {v: self.values[v] > 0 for v in range(1, size)}
+            self.stats.decisions += 1
+            self.limits.append(len(self.trail))
+            self.assign(variable if self.phases[variable] else -variable, None)
+
+
+def cdcl_check(knowledge, query, stats=None):
+    """Checks if knowledge base entails query, using CDCL.
+
+    If given, the SolverStats stats is filled with those of the search.
+    """
+    encoder = Tseitin()
+    encoder.add(knowledge)
+    encoder.add(Not(query))
+    solver = CDCL(encoder.clauses)
+    entailed = solver.solve() is None
+    if stats is not None:
+        vars(stats).update(vars(solver.stats))
+    return entailed
+
+
+def resolution_check(knowledge, query):
+    """Checks if knowledge base entails query, using resolution.
+
+    Only clauses of ¬query, and clauses derived from them, are resolved
+    against others (the set of support), smallest first, and only against
+    clauses holding a complementary literal. Tautologies, and clauses
+    subsumed by a kept clause, are discarded. Query is entailed once the
+    empty clause is derived. The set of support is complete only for a
+    consistent knowledge base, so if it runs out, knowledge entails query
+    only if it has no models at all.
+
+    Resolution rarely runs out when query is not entailed, so once more
+    than RESOLUTION_CLAUSES clauses are kept, the check falls back to DPLL.
+    """
+    ids = dict()
+    clauses = cnf_clauses(knowledge, ids)
+    count = len(clauses)
+    clauses += cnf_clauses(Not(query), ids)
+
+    # Kept clauses by literal, and those already resolved against
+    kept = set()
+    occurs = dict()
+    resolvable = dict()
+
+    # Set of support, as a heap of (size, order, clause)
+    support = []
+    order = itertools.count()
+
+    def discard(clause):
+        kept.discard(clause)
+        for literal in clause:
+            occurs[literal].discard(clause)
+            resolvable.get(literal, set()).discard(clause)
+
+    def keep(clause):
+        """Keeps a nonempty clause unless it is a tautology or subsumed,
+        discarding kept clauses it subsumes. Returns whether it was kept."""
+        if clause in kept or any(-literal in clause for literal in clause):
+            return False
+        if any(other <= clause
+               for literal in clause for other in occurs.get(literal, ())):
+            return False
+
+        # A clause it subsumes holds all its literals, so also its rarest
+        rarest = min(clause, key=lambda literal: len(occurs.get(literal, ())))
+        for other in list(occurs.get(rarest, ())):
+            if clause <= other:
+                discard(other)
+
+        kept.add(clause)
+        for literal in clause:
+            occurs.setdefault(literal, set()).add(clause)
+        return True
+
+    def resolve(clause):
+        for literal in clause:
+            resolvable.setdefault(literal, set()).add(clause)
+
+    for i, clause in enumerate(clauses):
+        clause = frozenset(clause)
+        if not clause:
+            return True
+        if keep(clause):
+            if i < count:
+                resolve(clause)
+            else:
+                heapq.heappush(support, (len(clause), next(order), clause))
+
+    while support:
+        _, _, given = heapq.heappop(support)
+        for literal in given:
+            if given not in kept:
+                break
+            for other in list(resolvable.get(-literal, ())):
+                resolvent = (given - {literal}) | (other - {-literal})
+                if not resolvent:
+                    return True
+                if keep(resolvent):
+                    if len(kept) > RESOLUTION_CLAUSES:
+                        return dpll_check(knowledge, query)
+                    heapq.heappush(
+                        support, (len(resolvent), next(order), resolvent)
+                    )
+        if given in kept:
+            resolve(given)
+
+    return dpll_satisfiable(clauses[:count]) is None
+
+
+class TruthTable():
+    """Evaluates sentences in every model of a set of symbols at once.
+
+    Models are numbered from 0 to 2^n - 1, with the i-th symbol in sorted
+    order true in model m when bit i of m is set. A sentence evaluates to a
+    column of bits, one per model, packed 64 to a NumPy uint64 word, so each
+    connective is a single vectorized operation over all models.
+    """
+
+    def __init__(self, symbols, limit=TABLE_SYMBOLS):
+        if np is None:
+            raise ImportError("truth tables require numpy")
+        self.symbols = sorted(symbols)
+        if len(self.symbols) > limit:
+            raise ValueError(
+                f"{len(self.symbols)} symbols is more than {limit} for a truth table"
+            )
+        self.size = 2 ** len(self.symbols)
+
+        # Bits of the last word that are models, when there are fewer than 64
+        self.words = max(1, self.size // 64)
+        self.mask = np.uint64((1 << min(self.size, 64)) - 1)
+
+        self.columns = dict()
+        for i, name in enumerate(self.symbols):
+            if i < 6:
+
+                # Symbol alternates within each word, every 2^i bits
+                pattern = sum(1 << m for m in range(64) if m >> i & 1)
+                column = np.full(self.words, pattern, dtype=np.uint64)
+            else:
+
+                # Symbol alternates between whole words, every 2^(i - 6) words
+                block = np.array([0, 2 ** 64 - 1], dtype=np.uint64)
+                column = np.repeat(
+                    np.tile(block, self.size >> (i + 1)), 1 << (i - 6)
+                )
+            self.columns[name] = column & self.mask
+
+    def evaluate(self, sentence):
+        """Returns the column of models in which a sentence is true."""
+        if isinstance(sentence, Symbol):
+            try:
+                return self.columns[sentence.name]
+            except KeyError:
+                raise ValueError(f"variable {sentence.name} not in table")
+        if isinstance(sentence, Not):
+            return ~self.evaluate(sentence.operand) & self.mask
+        if isinstance(sentence, (And, Or)):
+            is_and = isinstance(sentence, And)
+            operands = sentence.conjuncts if is_and else sentence.disjuncts
+            operation = np.bitwise_and if is_and else np.bitwise_or
+            result = np.full(self.words, self.mask if is_and else 0, dtype=np.uint64)
+            for operand in operands:
+                operation(result, self.evaluate(operand), out=result)
+            return result
+        if isinstance(sentence, Implication):
+            antecedent = self.evaluate(sentence.antecedent)
+            return (~antecedent & self.mask) | self.evaluate(sentence.consequent)
+        if isinstance(sentence, Biconditional):
+            difference = self.evaluate(sentence.left) ^ self.evaluate(sentence.right)
+            return ~difference & self.mask
+        raise TypeError("must be a logical sentence")
+
+    @staticmethod
+    def popcount(column):
+        """Returns how many bits of a column are set."""
+        return int(np.unpackbits(column.view(np.uint8)).sum(dtype=np.int64))
+
+    def count(self, sentence, given=None):
+        """Returns how many models of the table, or of given, satisfy a sentence."""
+        column = self.evaluate(sentence)
+        if given is not None:
+            column = column & self.evaluate(given)
+        return self.popcount(column)
+
+    def entails(self, knowledge, query):
+        """Checks if knowledge entails query: no model has knowledge ∧ ¬query."""
+        counter = self.evaluate(knowledge) & ~self.evaluate(query)
+        return not counter.any()
+
+    def marginals(self, knowledge):
+        """Returns the number of models of knowledge, and per symbol how
+        many of them make the symbol true."""
+        models = self.evaluate(knowledge)
+        return self.popcount(models), {
+            name: self.popcount(models & column)
+            for name, column in self.columns.items()
+        }
@@ -78,8 +78,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            answers = query_all(knowledge, symbols)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if answers[symbol] == "YES":
                     print(f"    {symbol}")
 
 